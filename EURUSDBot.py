@@ -6,9 +6,11 @@ import oandapyV20.endpoints.trades as trades
 import pandas as pd
 import logging
 import sqlite3
-from flask import Flask, render_template
+from flask import Flask, render_template, jsonify
 import time
 import threading
+from trade_analytics import TradeAnalytics
+from backtest import adx_threshold, trailing_stop_atr_multiplier, backtest_strategy
 
 # Configure logging
 logging.basicConfig(filename="trading_bot.log", level=logging.INFO,
@@ -25,9 +27,7 @@ client = oandapyV20.API(access_token=access_token)
 instrument = "EUR_USD"
 granularity = "M15"  # 15-minute chart
 risk_percentage = 0.03  # 3% risk per trade
-adx_threshold = 25
-atr_period = 14  # Period for ATR calculation
-trailing_stop_atr_multiplier = 2  # Multiplier for trailing stop based on ATR
+analytics_candle_count = 100  # Candles fetched each loop for the analytics MAE/MFE
 
 # --- Database Setup ---
 conn = sqlite3.connect('trades.db')
@@ -48,19 +48,21 @@ cursor.execute('''
 ''')
 conn.commit()
 
+# --- Analytics Setup ---
+analytics = TradeAnalytics('trades.db')
+
 # --- Flask App Setup ---
 app = Flask(__name__)
 
 # --- Helper Functions ---
-def get_historical_data(instruments, granularity, count):
-    """Fetches historical data for the given instruments."""
+def get_historical_data(instrument_names, granularity, count):
+    """Fetches historical data for the given comma-separated instruments."""
     try:
-        params = {"count": count, "granularity": granularity, "instruments": instruments}
-        r = instruments.InstrumentsCandles(params=params)
-        client.request(r)
-
+        params = {"count": count, "granularity": granularity}
         data = {}
-        for instrument in instruments.split(","):
+        for name in instrument_names.split(","):
+            r = instruments.InstrumentsCandles(instrument=name, params=params)
+            client.request(r)
             prices = [
                 {
                     "Date": pd.to_datetime(candle['time']),
@@ -70,114 +72,16 @@ def get_historical_data(instruments, granularity, count):
                     "Close": float(candle['mid']['c']),
                     "Volume": float(candle['volume'])
                 }
-                for candle in r.response['candles'] if candle['instrument'] == instrument
+                for candle in r.response['candles']
             ]
             df = pd.DataFrame(prices)
             df.set_index("Date", inplace=True)
-            data[instrument] = df
+            data[name] = df
         return data
     except oandapyV20.exceptions.V20Error as e:
         logging.error(f"Error fetching historical data: {e}")
         raise
 
-def calculate_adx(df, period=14):
-    """Calculates the Average Directional Index (ADX) for the given DataFrame."""
-    try:
-        df['TR'] = df[['High', 'Low', 'Close']].diff().abs().max(axis=1)
-        df['TR'] = df['TR'].fillna(df['High'] - df['Low'])
-        df['+DM'] = (df['High'] - df['High'].shift(1)).apply(lambda x: x if x > 0 else 0)
-        df['-DM'] = (df['Low'].shift(1) - df['Low']).apply(lambda x: x if x > 0 else 0)
-        df['+DM14'] = df['+DM'].rolling(window=period).mean()
-        df['-DM14'] = df['-DM'].rolling(window=period).mean()
-        df['TR14'] = df['TR'].rolling(window=period).mean()
-        df['+DI14'] = (df['+DM14'] / df['TR14']) * 100
-        df['-DI14'] = (df['-DM14'] / df['TR14']) * 100
-        df['DX'] = (df['+DI14'] - df['-DI14']).abs() / (df['+DI14'] + df['-DI14']) * 100
-        df['ADX'] = df['DX'].rolling(window=period).mean()
-        return df['ADX']
-    except Exception as e:
-        logging.error(f"Error calculating ADX: {e}")
-        raise
-
-def calculate_atr(df, period=14):
-    """Calculates the Average True Range (ATR) for the given DataFrame."""
-    try:
-        df['TR'] = df[['High', 'Low', 'Close']].diff().abs().max(axis=1)
-        df['TR'] = df['TR'].fillna(df['High'] - df['Low'])
-        df['ATR'] = df['TR'].rolling(window=period).mean()
-        return df['ATR']
-    except Exception as e:
-        logging.error(f"Error calculating ATR: {e}")
-        raise
-
-def backtest_strategy(df_eur_usd, df_dxy):
-    """Backtests the strategy with enhanced risk management and exit signals."""
-    try:
-        df_combined = pd.concat([df_eur_usd[['Close', 'Volume']], 
-                                 df_dxy[['Close', 'Volume']]], axis=1, 
-                                keys=['EUR_USD', 'DXY'])
-        df_combined.dropna(inplace=True)
-
-        df_combined['EUR_USD_SMA_20'] = df_combined['EUR_USD']['Close'].rolling(window=20).mean()
-        df_combined['DXY_SMA_20'] = df_combined['DXY']['Close'].rolling(window=20).mean()
-        df_combined['EUR_USD_Avg_Volume_20'] = df_combined['EUR_USD']['Volume'].rolling(window=20).mean()
-        df_combined['DXY_Avg_Volume_20'] = df_combined['DXY']['Volume'].rolling(window=20).mean()
-        df_combined['EUR_USD_ADX'] = calculate_adx(df_combined['EUR_USD'])
-        df_combined['DXY_ADX'] = calculate_adx(df_combined['DXY'])
-
-        df_combined['Signal'] = 0.0
-        df_combined['Signal'][(df_combined['EUR_USD']['Close'] < df_combined['EUR_USD_SMA_20']) &
-                             (df_combined['EUR_USD']['Volume'] > df_combined['EUR_USD_Avg_Volume_20']) &
-                             (df_combined['EUR_USD_ADX'] > adx_threshold) &
-                             (df_combined['DXY']['Close'] > df_combined['DXY_SMA_20']) &
-                             (df_combined['DXY']['Volume'] > df_combined['DXY_Avg_Volume_20']) &
-                             (df_combined['DXY_ADX'] > adx_threshold)] = -1.0  
-        df_combined['Signal'][(df_combined['EUR_USD']['Close'] > df_combined['EUR_USD_SMA_20']) &
-                             (df_combined['EUR_USD']['Volume'] > df_combined['EUR_USD_Avg_Volume_20']) &
-                             (df_combined['EUR_USD_ADX'] > adx_threshold) & 
-                             (df_combined['DXY']['Close'] < df_combined['DXY_SMA_20']) &
-                             (df_combined['DXY']['Volume'] > df_combined['DXY_Avg_Volume_20']) &
-                             (df_combined['DXY_ADX'] > adx_threshold)] = 1.0
-
-        # --- Enhanced Risk Management and Exit Signals ---
-        df_combined['Position'] = df_combined['Signal'].diff()
-        df_combined['Entry Price'] = df_combined['EUR_USD']['Close'].shift(1)
-
-        df_combined['ATR'] = calculate_atr(df_combined['EUR_USD'], atr_period)
-        df_combined['Stop Loss'] = 0.0
-        df_combined.loc[df_combined['Position'] == 1, 'Stop Loss'] = df_combined['Entry Price'] - (trailing_stop_atr_multiplier * df_combined['ATR'])
-        df_combined.loc[df_combined['Position'] == -1, 'Stop Loss'] = df_combined['Entry Price'] + (trailing_stop_atr_multiplier * df_combined['ATR'])
-        df_combined['Exit Signal'] = 0.0
-        df_combined.loc[(df_combined['EUR_USD_ADX'] < adx_threshold) | (df_combined['DXY_ADX'] < adx_threshold), 'Exit Signal'] = 1.0
-
-        current_position = 0
-        entry_price = 0
-        stop_loss_price = 0
-        for i in range(1, len(df_combined)):
-            if df_combined['Position'].iloc[i] != 0:
-                current_position = df_combined['Position'].iloc[i]
-                entry_price = df_combined['Entry Price'].iloc[i]
-                stop_loss_price = df_combined['Stop Loss'].iloc[i]
-            elif current_position != 0:
-                if current_position == 1 and df_combined['EUR_USD']['Close'].iloc[i] > entry_price:
-                    entry_price = df_combined['EUR_USD']['Close'].iloc[i]
-                    stop_loss_price = entry_price - (trailing_stop_atr_multiplier * df_combined['ATR'].iloc[i])
-                elif current_position == -1 and df_combined['EUR_USD']['Close'].iloc[i] < entry_price:
-                    entry_price = df_combined['EUR_USD']['Close'].iloc[i]
-                    stop_loss_price = entry_price + (trailing_stop_atr_multiplier * df_combined['ATR'].iloc[i])
-                if (current_position == 1 and df_combined['EUR_USD']['Close'].iloc[i] < stop_loss_price) or \
-                   (current_position == -1 and df_combined['EUR_USD']['Close'].iloc[i] > stop_loss_price) or \
-                   (df_combined['Exit Signal'].iloc[i] == 1):
-                    current_position = 0
-            df_combined['Position'].iloc[i] = current_position
-
-        df_combined['Returns'] = df_combined['EUR_USD']['Close'].pct_change() * df_combined['Position'].shift(1)
-        df_combined['Cumulative Returns'] = (1 + df_combined['Returns']).cumprod()
-        return df_combined
-    except Exception as e:
-        logging.error(f"Error backtesting strategy: {e}")
-        raise
-
 def get_current_price(instrument):
     """Fetches the current price of the instrument."""
     try:
@@ -283,6 +187,12 @@ def index():
     trades_data = cursor.fetchall()
     return render_template('trades.html', trades=trades_data)
 
+@app.route('/analytics')
+def analytics_summary():
+    """Returns the cached performance analytics as JSON."""
+    analytics.refresh()
+    return jsonify(analytics.summary())
+
 # --- Main Trading Logic ---
 def main():
     """Main function to execute the trading strategy."""
@@ -293,12 +203,14 @@ def main():
         data = get_historical_data("EUR_USD,USD_IDX", granularity, 500)
         df_eur_usd = data["EUR_USD"]
         df_dxy = data["USD_IDX"]
-        backtest_results = backtest_strategy(df_eur_usd.copy(), df_dxy.copy())
+        analytics.set_candles(df_eur_usd)
+        backtest_results = backtest_strategy(df_eur_usd, df_dxy, columns=[
+            'EUR_USD_Close', 'EUR_USD_Volume', 'EUR_USD_SMA_20', 'EUR_USD_Avg_Volume_20', 'EUR_USD_ADX',
+            'DXY_Close', 'DXY_Volume', 'DXY_SMA_20', 'DXY_Avg_Volume_20', 'DXY_ADX',
+            'ATR', 'Signal', 'Position', 'Returns', 'Cumulative Returns'])
 
         print("\nBacktesting Results:")
-        print(backtest_results[['EUR_USD', 'EUR_USD_SMA_20', 'EUR_USD_Avg_Volume_20', 'EUR_USD_ADX',
-                                 'DXY', 'DXY_SMA_20', 'DXY_Avg_Volume_20', 'DXY_ADX',
-                                 'Signal', 'Position', 'Returns', 'Cumulative Returns']].tail())
+        print(backtest_results.drop(columns=['ATR']).tail())
 
         # --- User Input for Live Trading ---
         choice = input("\nDo you want to start auto-trading? (yes/no): ")
@@ -405,6 +317,12 @@ def main():
                         stop_loss = abs(current_price - (current_price + trailing_stop_atr_multiplier * backtest_results['ATR'].iloc[-1]))
                         place_market_order(instrument, units, stop_loss)
 
+                # --- Keep the dashboard's MAE/MFE candles up to date ---
+                try:
+                    analytics.set_candles(get_historical_data(instrument, granularity, analytics_candle_count)[instrument])
+                except Exception as e:
+                    logging.error(f"Error updating analytics candles: {e}")
+
                 # Wait for the next 15-minute candle
                 time.sleep(900)  # 15 minutes = 900 seconds
 
@@ -420,4 +338,4 @@ if __name__ == "__main__":
     threading.Thread(target=app.run, kwargs={'host':'0.0.0.0'}).start()
 
     # Run the main trading logic
-    main()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -2,10 +2,9 @@ import oandapyV20
 import oandapyV20.endpoints.instruments as instruments
 import oandapyV20.endpoints.orders as orders
 import oandapyV20.endpoints.accounts as accounts
-import time
 import pandas as pd
-import datetime
 import sqlite3
+from session_scheduler import SessionScheduler
 
 # Replace with your Oanda account credentials
 accountID = "your_account_id"  # Replace with your account ID
@@ -18,6 +17,14 @@ client = oandapyV20.API(access_token=access_token)
 dxy_instrument = "USD_IDX"
 eurus_instrument = "EUR_USD"
 
+# Strategy timing: FX session calendar (New York time, DST and holidays aware)
+scheduler = SessionScheduler()
+
+# Live trading state
+expectancy = None
+eurus_entry_price = 0
+trading_job = None
+
 # --- Database functions ---
 def create_database():
     conn = sqlite3.connect('trades.db')
@@ -177,110 +184,99 @@ def backtest(dxy_prices, eurus_prices):
     expectancy = win_rate * avg_win - (1 - win_rate) * abs(avg_loss)
     return expectancy
 
-def run_strategy():
-    # Get current time (EST)
-    now = datetime.datetime.now(datetime.timezone(datetime.timedelta(hours=-5)))
-
-    # Check if it's market open (adjust hours as needed)
-    if now.hour == 18 and now.minute == 0 and now.weekday() == 6:  # Sunday 6:00 PM EST
-        # Backtest
-        dxy_historical_prices = get_historical_prices(dxy_instrument)
-        eurus_historical_prices = get_historical_prices(eurus_instrument)
-        expectancy = backtest(dxy_historical_prices, eurus_historical_prices)
-
-        # Store expectancy in database
-        insert_trade(eurus_instrument, "N/A", 0, expectancy=expectancy)
-
-        if expectancy > 0:
-            print(f"Positive expectancy ({expectancy:.4f}). Starting live trading...")
-            # --- Live trading logic ---
-            previous_dxy_price = get_price(dxy_instrument)
-            while True:
-                try:
-                    # Get current prices and historical data
-                    dxy_price = get_price(dxy_instrument)
-                    eurus_price = get_price(eurus_instrument)
-                    dxy_prices = get_historical_prices(dxy_instrument, count=20)
-
-                    # Calculate 20-period SMA for DXY
-                    dxy_sma = calculate_sma(dxy_prices)
-
-                    # Get current EUR_USD position
-                    current_position = get_eurus_position()
-
-                    # Price action analysis (bullish engulfing)
-                    if (
-                        dxy_prices[-2]['close'] < dxy_prices[-2]['open']
-                        and dxy_price > dxy_prices[-2]['open']
-                        and dxy_price > dxy_prices[-2]['close']
-                    ):
-                        dxy_trend_up = True
-                    else:
-                        dxy_trend_up = False
-
-                    # ATR-based trailing stop-loss
-                    dxy_atr = calculate_atr(dxy_prices)
-                    if current_position > 0:  # Long EUR_USD
-                        stop_loss = eurus_price - 2 * dxy_atr
-                        if eurus_price < stop_loss:
-                            close_position(eurus_instrument, current_position)
-                            profit = stop_loss - eurus_entry_price
-                            insert_trade(eurus_instrument, "long", eurus_entry_price, stop_loss, profit, expectancy)
-                            current_position = 0
-                    elif current_position < 0:  # Short EUR_USD
-                        stop_loss = eurus_price + 2 * dxy_atr
-                        if eurus_price > stop_loss:
-                            close_position(eurus_instrument, current_position)
-                            profit = eurus_entry_price - stop_loss
-                            insert_trade(eurus_instrument, "short", eurus_entry_price, stop_loss, profit, expectancy)
-                            current_position = 0
-
-                    # Combine SMA, price action, and ATR for trend confirmation
-                    if dxy_price > dxy_sma and dxy_trend_up and dxy_atr > 0.1:
-                        if current_position > 0:
-                            close_position(eurus_instrument, current_position)
-                        if current_position >= 0:
-                            place_market_order(eurus_instrument, 1000, "sell")
-                            eurus_entry_price = eurus_price
-                            insert_trade(eurus_instrument, "short", eurus_entry_price, expectancy=expectancy)
-                            current_position = -1000
-                    elif dxy_price < dxy_sma and not dxy_trend_up and dxy_atr > 0.1:
-                        if current_position < 0:
-                            close_position(eurus_instrument, current_position)
-                        if current_position <= 0:
-                            place_market_order(eurus_instrument, 1000, "buy")
-                            eurus_entry_price = eurus_price
-                            insert_trade(eurus_instrument, "long", eurus_entry_price, expectancy=expectancy)
-                            current_position = 1000
-
-                    # Wait for the next interval
-                    time.sleep(300)
-
-                except Exception as e:
-                    print(f"An error occurred: {e}")
-                    time.sleep(60)
-
-                # Check if it's market close (adjust hours as needed)
-                now = datetime.datetime.now(datetime.timezone(datetime.timedelta(hours=-5)))
-                if now.hour == 17 and now.minute == 0 and now.weekday() == 4:  # Friday 5:00 PM EST
-                    # Close all open positions
-                    current_position = get_eurus_position()
-                    if current_position != 0:
-                        close_position(eurus_instrument, current_position)
-                        print("All positions closed at market close.")
-                    break  # Exit the live trading loop
-
-        else:
-            print(f"Negative expectancy ({expectancy:.4f}). Not trading today.")
+# --- Scheduled strategy ---
+def start_session():
+    global expectancy, trading_job
+    # Backtest
+    dxy_historical_prices = get_historical_prices(dxy_instrument)
+    eurus_historical_prices = get_historical_prices(eurus_instrument)
+    expectancy = backtest(dxy_historical_prices, eurus_historical_prices)
+
+    # Store expectancy in database
+    insert_trade(eurus_instrument, "N/A", 0, expectancy=expectancy)
+
+    if expectancy > 0:
+        print(f"Positive expectancy ({expectancy:.4f}). Starting live trading...")
+        # --- Live trading runs at every 5-minute bar close until the session closes ---
+        trading_job = scheduler.call_every_bar(5, trade_bar)
+    else:
+        print(f"Negative expectancy ({expectancy:.4f}). Not trading today.")
+
+def trade_bar():
+    global eurus_entry_price
+    # Get current prices and historical data
+    dxy_price = get_price(dxy_instrument)
+    eurus_price = get_price(eurus_instrument)
+    dxy_prices = get_historical_prices(dxy_instrument, count=20)
+
+    # Calculate 20-period SMA for DXY
+    dxy_sma = calculate_sma(dxy_prices)
+
+    # Get current EUR_USD position
+    current_position = get_eurus_position()
+
+    # Price action analysis (bullish engulfing)
+    if (
+        dxy_prices[-2]['close'] < dxy_prices[-2]['open']
+        and dxy_price > dxy_prices[-2]['open']
+        and dxy_price > dxy_prices[-2]['close']
+    ):
+        dxy_trend_up = True
+    else:
+        dxy_trend_up = False
+
+    # ATR-based trailing stop-loss
+    dxy_atr = calculate_atr(dxy_prices)
+    if current_position > 0:  # Long EUR_USD
+        stop_loss = eurus_price - 2 * dxy_atr
+        if eurus_price < stop_loss:
+            close_position(eurus_instrument, current_position)
+            profit = stop_loss - eurus_entry_price
+            insert_trade(eurus_instrument, "long", eurus_entry_price, stop_loss, profit, expectancy)
+            current_position = 0
+    elif current_position < 0:  # Short EUR_USD
+        stop_loss = eurus_price + 2 * dxy_atr
+        if eurus_price > stop_loss:
+            close_position(eurus_instrument, current_position)
+            profit = eurus_entry_price - stop_loss
+            insert_trade(eurus_instrument, "short", eurus_entry_price, stop_loss, profit, expectancy)
+            current_position = 0
+
+    # Combine SMA, price action, and ATR for trend confirmation
+    if dxy_price > dxy_sma and dxy_trend_up and dxy_atr > 0.1:
+        if current_position > 0:
+            close_position(eurus_instrument, current_position)
+        if current_position >= 0:
+            place_market_order(eurus_instrument, 1000, "sell")
+            eurus_entry_price = eurus_price
+            insert_trade(eurus_instrument, "short", eurus_entry_price, expectancy=expectancy)
+            current_position = -1000
+    elif dxy_price < dxy_sma and not dxy_trend_up and dxy_atr > 0.1:
+        if current_position < 0:
+            close_position(eurus_instrument, current_position)
+        if current_position <= 0:
+            place_market_order(eurus_instrument, 1000, "buy")
+            eurus_entry_price = eurus_price
+            insert_trade(eurus_instrument, "long", eurus_entry_price, expectancy=expectancy)
+            current_position = 1000
+
+def end_session():
+    global trading_job
+    if trading_job is None:
+        return
+    # Stop trading and close all open positions at market close
+    trading_job.cancel()
+    trading_job = None
+    current_position = get_eurus_position()
+    if current_position != 0:
+        close_position(eurus_instrument, current_position)
+        print("All positions closed at market close.")
 
 # --- Main program ---
 if __name__ == "__main__":
     create_database()  # Create the database
 
-    while True:
-        try:
-            run_strategy()
-            time.sleep(60)  # Check every minute
-        except Exception as e:
-            print(f"An error occurred: {e}")
-            time.sleep(60)
\ No newline at end of file
+    # Sleeps until each session open/close and bar close instead of polling
+    scheduler.call_at_session_close(end_session)
+    scheduler.call_at_session_open(start_session)
+    scheduler.run()
@@ -0,0 +1,198 @@
+"""Indicators and backtest for the EURUSDBot strategy. Importing this module has no side effects."""
+import logging
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import pandas as pd
+
+# --- Strategy Parameters ---
+adx_threshold = 25
+adx_period = 14  # Period for ADX calculation
+atr_period = 14  # Period for ATR calculation
+trailing_stop_atr_multiplier = 2  # Multiplier for trailing stop based on ATR
+
+# --- Indicators ---
+def _rolling_mean(values, window, out):
+    """Writes the rolling mean of values into the preallocated out array (NaN until the window fills).
+
+    out must not share memory with values.
+    """
+    if len(values) >= window:
+        sliding_window_view(values, window).mean(axis=-1, out=out[window - 1:])
+        out[:window - 1] = np.nan
+    else:
+        out[:] = np.nan
+    return out
+
+def _true_range(high, low, close):
+    """True range as used by the strategy: the largest absolute bar-to-bar move of High, Low or Close."""
+    tr = np.empty(len(close))
+    if len(close):
+        tr[0] = high[0] - low[0]
+        np.maximum(np.abs(np.diff(high)), np.abs(np.diff(low)), out=tr[1:])
+        np.maximum(tr[1:], np.abs(np.diff(close)), out=tr[1:])
+    return tr
+
+def _adx(high, low, close, period, tr=None):
+    """Calculates the ADX on raw arrays, reusing the +DM/-DM buffers for later intermediates."""
+    n = len(close)
+    if tr is None:
+        tr = _true_range(high, low, close)
+    plus_dm = np.zeros(n)
+    minus_dm = np.zeros(n)
+    if n:
+        np.subtract(high[1:], high[:-1], out=plus_dm[1:])
+        np.subtract(low[:-1], low[1:], out=minus_dm[1:])
+        plus_dm[~(plus_dm > 0)] = 0
+        minus_dm[~(minus_dm > 0)] = 0
+
+    plus_di = _rolling_mean(plus_dm, period, np.empty(n))
+    minus_di = _rolling_mean(minus_dm, period, np.empty(n))
+    tr14 = _rolling_mean(tr, period, plus_dm)
+    dx = minus_dm
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di /= tr14
+        plus_di *= 100
+        minus_di /= tr14
+        minus_di *= 100
+        np.subtract(plus_di, minus_di, out=dx)
+        np.abs(dx, out=dx)
+        np.add(plus_di, minus_di, out=tr14)
+        dx /= tr14
+        dx *= 100
+    return _rolling_mean(dx, period, plus_di)
+
+# --- Backtesting ---
+# Columns backtest_strategy can return
+BACKTEST_COLUMNS = ['EUR_USD_Close', 'EUR_USD_Volume', 'DXY_Close', 'DXY_Volume',
+                    'EUR_USD_SMA_20', 'DXY_SMA_20', 'EUR_USD_Avg_Volume_20', 'DXY_Avg_Volume_20',
+                    'EUR_USD_ADX', 'DXY_ADX', 'Signal', 'Entry Price', 'ATR', 'Stop Loss',
+                    'Exit Signal', 'Position', 'Returns', 'Cumulative Returns']
+INPUT_COLUMNS = {'EUR_USD_Close', 'EUR_USD_Volume', 'DXY_Close', 'DXY_Volume'}
+
+def _aligned_views(df_eur_usd, df_dxy):
+    """Returns read-only OHLCV arrays of both frames on their common, complete rows.
+
+    When both frames already share an index with no missing values, the arrays
+    are views on the caller's data and nothing is copied.
+    """
+    fields = ['High', 'Low', 'Close', 'Volume']
+    index = df_eur_usd.index
+    if index.equals(df_dxy.index):
+        rows = None
+    else:
+        index = index.intersection(df_dxy.index, sort=False)
+        rows = (df_eur_usd.index.get_indexer(index), df_dxy.index.get_indexer(index))
+
+    views = {}
+    for key, df, take in (('EUR_USD', df_eur_usd, rows and rows[0]), ('DXY', df_dxy, rows and rows[1])):
+        for field in fields:
+            values = df[field].to_numpy(dtype=float)
+            views[key, field] = values if take is None else values[take]
+
+    # Same rows as dropping incomplete Close/Volume rows after the old concat
+    complete = np.ones(len(index), dtype=bool)
+    for key in ('EUR_USD', 'DXY'):
+        complete &= ~np.isnan(views[key, 'Close']) & ~np.isnan(views[key, 'Volume'])
+    if not complete.all():
+        index = index[complete]
+        views = {name: values[complete] for name, values in views.items()}
+
+    for name, values in views.items():
+        views[name] = values.view()
+        views[name].flags.writeable = False
+    return index, views
+
+def backtest_strategy(df_eur_usd, df_dxy, columns=None):
+    """Backtests the strategy with enhanced risk management and exit signals.
+
+    Works on read-only views of the input candles (which need High, Low, Close
+    and Volume) and fills preallocated arrays; only the requested columns
+    (default: all of BACKTEST_COLUMNS) are returned, all of them writable.
+    """
+    try:
+        columns = BACKTEST_COLUMNS if columns is None else list(columns)
+        unknown = set(columns) - set(BACKTEST_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown backtest columns: {sorted(unknown)}")
+
+        index, v = _aligned_views(df_eur_usd, df_dxy)
+        n = len(index)
+        eur_close, dxy_close = v['EUR_USD', 'Close'], v['DXY', 'Close']
+        eur_volume, dxy_volume = v['EUR_USD', 'Volume'], v['DXY', 'Volume']
+
+        out = {
+            'EUR_USD_Close': eur_close,
+            'EUR_USD_Volume': eur_volume,
+            'DXY_Close': dxy_close,
+            'DXY_Volume': dxy_volume,
+            'EUR_USD_SMA_20': _rolling_mean(eur_close, 20, np.empty(n)),
+            'DXY_SMA_20': _rolling_mean(dxy_close, 20, np.empty(n)),
+            'EUR_USD_Avg_Volume_20': _rolling_mean(eur_volume, 20, np.empty(n)),
+            'DXY_Avg_Volume_20': _rolling_mean(dxy_volume, 20, np.empty(n)),
+        }
+        eur_tr = _true_range(v['EUR_USD', 'High'], v['EUR_USD', 'Low'], eur_close)
+        eur_adx = out['EUR_USD_ADX'] = _adx(v['EUR_USD', 'High'], v['EUR_USD', 'Low'], eur_close, adx_period, eur_tr)
+        dxy_adx = out['DXY_ADX'] = _adx(v['DXY', 'High'], v['DXY', 'Low'], dxy_close, adx_period)
+
+        common = ((eur_volume > out['EUR_USD_Avg_Volume_20']) & (eur_adx > adx_threshold) &
+                  (dxy_volume > out['DXY_Avg_Volume_20']) & (dxy_adx > adx_threshold))
+        signal = out['Signal'] = np.zeros(n)
+        signal[common & (eur_close < out['EUR_USD_SMA_20']) & (dxy_close > out['DXY_SMA_20'])] = -1.0
+        signal[common & (eur_close > out['EUR_USD_SMA_20']) & (dxy_close < out['DXY_SMA_20'])] = 1.0
+
+        # --- Enhanced Risk Management and Exit Signals ---
+        position = out['Position'] = np.empty(n)
+        entry = out['Entry Price'] = np.empty(n)
+        if n:
+            position[0] = entry[0] = np.nan
+            np.subtract(signal[1:], signal[:-1], out=position[1:])
+            entry[1:] = eur_close[:-1]
+
+        atr = out['ATR'] = _rolling_mean(eur_tr, atr_period, np.empty(n))
+        stop = out['Stop Loss'] = np.zeros(n)
+        stop[position == 1] = (entry - trailing_stop_atr_multiplier * atr)[position == 1]
+        stop[position == -1] = (entry + trailing_stop_atr_multiplier * atr)[position == -1]
+        exit_signal = out['Exit Signal'] = ((eur_adx < adx_threshold) | (dxy_adx < adx_threshold)).astype(float)
+
+        current_position = 0
+        entry_price = 0
+        stop_loss_price = 0
+        for i in range(1, n):
+            if position[i] != 0:
+                current_position = position[i]
+                entry_price = entry[i]
+                stop_loss_price = stop[i]
+            elif current_position != 0:
+                close = eur_close[i]
+                if current_position == 1 and close > entry_price:
+                    entry_price = close
+                    stop_loss_price = entry_price - (trailing_stop_atr_multiplier * atr[i])
+                elif current_position == -1 and close < entry_price:
+                    entry_price = close
+                    stop_loss_price = entry_price + (trailing_stop_atr_multiplier * atr[i])
+                if (current_position == 1 and close < stop_loss_price) or \
+                   (current_position == -1 and close > stop_loss_price) or \
+                   (exit_signal[i] == 1):
+                    current_position = 0
+            position[i] = current_position
+
+        returns = out['Returns'] = np.full(n, np.nan)
+        if n > 1:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                np.divide(eur_close[1:], eur_close[:-1], out=returns[1:])
+            returns[1:] -= 1
+            returns[1:] *= position[:-1]
+        if 'Cumulative Returns' in columns:
+            # Matches pandas cumprod: NaN rows stay NaN and are skipped
+            missing = np.isnan(returns)
+            cumulative = out['Cumulative Returns'] = np.where(missing, 1.0, returns + 1)
+            np.cumprod(cumulative, out=cumulative)
+            cumulative[missing] = np.nan
+
+        # Input columns are read-only views of the caller's candles, copy them so the result stays writable
+        result = {col: out[col].copy() if col in INPUT_COLUMNS else out[col] for col in columns}
+        return pd.DataFrame(result, index=index, copy=False)
+    except Exception as e:
+        logging.error(f"Error backtesting strategy: {e}")
+        raise
@@ -0,0 +1,56 @@
+"""Memory benchmark for EURUSDBot.backtest_strategy.
+
+Runs the backtest on synthetic M15 candles and reports peak traced memory
+relative to the raw candle size. Usage: python benchmark_backtest.py [years ...]
+"""
+import sys
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from backtest import backtest_strategy
+
+# Columns the live trading loop reads from the backtest
+LIVE_COLUMNS = ['EUR_USD_SMA_20', 'DXY_SMA_20', 'EUR_USD_ADX', 'DXY_ADX', 'ATR']
+CANDLES_PER_YEAR = 252 * 24 * 4  # M15 candles
+
+
+def make_candles(count, start_price, seed):
+    """Builds a random-walk OHLCV frame like get_historical_data returns."""
+    rng = np.random.default_rng(seed)
+    close = start_price + np.cumsum(rng.normal(0, start_price * 0.0005, count))
+    spread = np.abs(rng.normal(0, start_price * 0.0005, (2, count)))
+    return pd.DataFrame({
+        "Open": close,
+        "High": close + spread[0],
+        "Low": close - spread[1],
+        "Close": close,
+        "Volume": rng.integers(100, 5000, count).astype(float),
+    }, index=pd.date_range("2015-01-01", periods=count, freq="15min", name="Date"))
+
+
+def peak_memory(func):
+    """Returns the peak memory (bytes) allocated while running func."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(years):
+    print(f"{'years':>5} {'candles':>9} {'raw MB':>8} {'all cols MB':>12} {'live cols MB':>13}")
+    for year in years:
+        count = int(year * CANDLES_PER_YEAR)
+        df_eur_usd = make_candles(count, 1.1, 1)
+        df_dxy = make_candles(count, 100.0, 2)
+        raw = (df_eur_usd.memory_usage(deep=True).sum() + df_dxy.memory_usage(deep=True).sum()) / 1e6
+        full = peak_memory(lambda: backtest_strategy(df_eur_usd, df_dxy)) / 1e6
+        lean = peak_memory(lambda: backtest_strategy(df_eur_usd, df_dxy, columns=LIVE_COLUMNS)) / 1e6
+        print(f"{year:>5} {count:>9} {raw:>8.1f} {full:>12.1f} {lean:>13.1f}")
+
+
+if __name__ == "__main__":
+    main([float(arg) for arg in sys.argv[1:]] or [1, 5, 10])
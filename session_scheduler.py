@@ -0,0 +1,179 @@
+import datetime
+import heapq
+import itertools
+import time
+from zoneinfo import ZoneInfo
+
+# --- Session Parameters ---
+market_timezone = ZoneInfo("America/New_York")  # FX sessions follow New York time, DST included
+session_open_weekday = 6  # Sunday
+session_open_time = datetime.time(18, 0)  # 6:00 PM New York
+session_close_weekday = 4  # Friday
+session_close_time = datetime.time(17, 0)  # 5:00 PM New York, also the daily rollover
+fx_holidays = {(1, 1), (12, 25)}  # (month, day) closures: New Year's Day, Christmas Day
+
+UTC = datetime.timezone.utc
+
+
+class SystemClock:
+    """Wall clock used in production. Sleeping blocks the thread, so waiting costs no CPU."""
+
+    def now(self):
+        return datetime.datetime.now(UTC)
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+# --- FX Session Calendar ---
+class FXSessionCalendar:
+    """Weekly FX trading sessions in New York time, minus holiday closures.
+
+    All inputs and outputs are timezone-aware UTC datetimes; conversion to and
+    from New York time goes through zoneinfo so DST changes are handled.
+    A holiday closes the market for its trading day, i.e. from the previous
+    day's rollover to the holiday's rollover.
+    """
+
+    def __init__(self, tz=market_timezone, open_weekday=session_open_weekday, open_time=session_open_time,
+                 close_weekday=session_close_weekday, close_time=session_close_time, holidays=fx_holidays):
+        self.tz = tz
+        self.open_weekday = open_weekday
+        self.open_time = open_time
+        self.close_weekday = close_weekday
+        self.close_time = close_time
+        self.holidays = set(holidays)
+
+    def _at(self, day, at):
+        """Converts a New York date and time to UTC."""
+        return datetime.datetime.combine(day, at, tzinfo=self.tz).astimezone(UTC)
+
+    def _week_sessions(self, open_day):
+        """Returns the sessions of the trading week opening on open_day, split around holidays."""
+        close_day = open_day + datetime.timedelta(days=(self.close_weekday - self.open_weekday) % 7)
+        sessions = [(self._at(open_day, self.open_time), self._at(close_day, self.close_time))]
+        day = open_day
+        while day <= close_day:
+            if (day.month, day.day) in self.holidays:
+                gap_start = self._at(day - datetime.timedelta(days=1), self.close_time)
+                gap_end = self._at(day, self.close_time)
+                split = []
+                for start, end in sessions:
+                    if start < gap_start:
+                        split.append((start, min(end, gap_start)))
+                    if end > gap_end:
+                        split.append((max(start, gap_end), end))
+                sessions = split
+            day += datetime.timedelta(days=1)
+        return [(start, end) for start, end in sessions if start < end]
+
+    def sessions(self, after):
+        """Yields (open, close) for every session that has not closed by `after`, in order."""
+        local_day = after.astimezone(self.tz).date()
+        open_day = local_day - datetime.timedelta(days=(local_day.weekday() - self.open_weekday) % 7)
+        while True:
+            for start, end in self._week_sessions(open_day):
+                if end > after:
+                    yield start, end
+            open_day += datetime.timedelta(days=7)
+
+    def is_open(self, when):
+        """Checks whether the market is open at `when`."""
+        start, end = next(self.sessions(when))
+        return start <= when < end
+
+    def next_open(self, after):
+        """Returns the first session open strictly after `after`."""
+        return next(start for start, end in self.sessions(after) if start > after)
+
+    def next_close(self, after):
+        """Returns the first session close strictly after `after`."""
+        return next(self.sessions(after))[1]
+
+    def next_bar_close(self, after, minutes):
+        """Returns the first close of a `minutes` bar after `after` whose bar lies within a session.
+
+        Bars are aligned to UTC like Oanda's candles.
+        """
+        step = datetime.timedelta(minutes=minutes)
+        epoch = datetime.datetime(1970, 1, 1, tzinfo=UTC)
+        next_close = epoch + ((after - epoch) // step + 1) * step
+        for start, end in self.sessions(after):
+            first_close = epoch - ((epoch - start - step) // step) * step
+            when = max(next_close, first_close)
+            if when <= end:
+                return when
+
+
+# --- Scheduler ---
+class ScheduledJob:
+    """A scheduled call. `reschedule` returns the next run time, or None for a one-off job."""
+
+    def __init__(self, func, reschedule=None):
+        self.func = func
+        self.reschedule = reschedule
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class SessionScheduler:
+    """Heap-based scheduler that sleeps until the next due job instead of polling.
+
+    The clock is injected (anything with now() and sleep(seconds)), so tests can
+    drive the scheduler with a simulated clock.
+    """
+
+    def __init__(self, calendar=None, clock=None):
+        self.calendar = calendar or FXSessionCalendar()
+        self.clock = clock or SystemClock()
+        self._queue = []
+        self._counter = itertools.count()
+        self._running = False
+
+    def call_at(self, when, func, reschedule=None):
+        """Schedules func at the UTC datetime `when`."""
+        job = ScheduledJob(func, reschedule)
+        self._push(when, job)
+        return job
+
+    def _push(self, when, job):
+        heapq.heappush(self._queue, (when, next(self._counter), job))
+
+    def call_every_bar(self, minutes, func):
+        """Calls func at every in-session close of a `minutes` bar."""
+        next_bar = lambda after: self.calendar.next_bar_close(after, minutes)
+        return self.call_at(next_bar(self.clock.now()), func, next_bar)
+
+    def call_at_session_open(self, func):
+        """Calls func at every session open."""
+        return self.call_at(self.calendar.next_open(self.clock.now()), func, self.calendar.next_open)
+
+    def call_at_session_close(self, func):
+        """Calls func at every session close."""
+        return self.call_at(self.calendar.next_close(self.clock.now()), func, self.calendar.next_close)
+
+    def stop(self):
+        """Stops run() once the current job returns."""
+        self._running = False
+
+    def run(self):
+        """Runs due jobs, sleeping until the next one, until stopped or out of jobs."""
+        self._running = True
+        while self._running and self._queue:
+            when, _, job = self._queue[0]
+            if job.cancelled:
+                heapq.heappop(self._queue)
+                continue
+            delay = (when - self.clock.now()).total_seconds()
+            if delay > 0:
+                self.clock.sleep(delay)
+                continue  # Re-check: sleep can return early and jobs may have been cancelled
+            heapq.heappop(self._queue)
+            try:
+                job.func()
+            except Exception as e:
+                print(f"An error occurred: {e}")
+            if job.reschedule is not None and not job.cancelled:
+                self._push(job.reschedule(max(when, self.clock.now())), job)
@@ -0,0 +1,397 @@
+import logging
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+# --- Analytics Parameters ---
+sharpe_window = 50  # Number of closed trades per rolling Sharpe window
+max_curve_points = 2000  # Max points per curve sent to the dashboard
+initial_capacity = 1024  # Initial row capacity of the columnar buffers
+sqlite_chunk_size = 900  # Max bound parameters per query, below SQLite's 999 limit
+max_candle_history = 35040  # Max candles kept for MAE/MFE (about a year of M15)
+
+# Column layout of the in-memory journal: name -> dtype
+COLUMNS = {
+    "id": np.int64,
+    "timestamp": "datetime64[ns]",
+    "exit_time": "datetime64[ns]",
+    "entry_price": np.float64,
+    "pnl": np.float64,
+    "direction": np.int8,
+    "hour": np.int8,
+    "weekday": np.int8,
+    "mae": np.float64,
+    "mfe": np.float64,
+    "measured": np.bool_,  # MAE/MFE window closed, values final
+}
+
+
+# --- Vectorized Metrics ---
+def rolling_sharpe(pnl, window=sharpe_window):
+    """Calculates the per-trade Sharpe ratio over a rolling window of trades.
+
+    Windows with no spread in profit/loss (up to rounding) give NaN.
+    """
+    if len(pnl) < window or window < 2:
+        return np.empty(0)
+    # pandas' rolling std is O(n) and gives exactly 0 for constant windows
+    rolling = pd.Series(pnl).rolling(window)
+    mean = rolling.mean().to_numpy()[window - 1:]
+    std = rolling.std().to_numpy()[window - 1:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(std > 1e-12 * np.abs(mean), mean / std, np.nan)
+
+
+def drawdown(pnl):
+    """Returns the equity curve and the drawdown from its running peak."""
+    equity = np.cumsum(pnl)
+    peak = np.maximum.accumulate(np.maximum(equity, 0.0)) if len(equity) else equity
+    return equity, equity - peak
+
+
+def pnl_by_bucket(keys, pnl, buckets):
+    """Sums profit/loss and counts trades per bucket (hour of day, weekday...)."""
+    totals = np.bincount(keys, weights=pnl, minlength=buckets)
+    counts = np.bincount(keys, minlength=buckets)
+    return totals, counts
+
+
+def streaks(pnl):
+    """Finds the longest winning/losing streaks and the current streak.
+
+    The current streak is positive for wins and negative for losses.
+    """
+    signs = np.sign(pnl).astype(np.int8)
+    if len(signs) == 0:
+        return {"longest_win": 0, "longest_loss": 0, "current": 0}
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(signs)) + 1))
+    lengths = np.diff(np.concatenate((starts, [len(signs)])))
+    run_signs = signs[starts]
+    wins = lengths[run_signs > 0]
+    losses = lengths[run_signs < 0]
+    return {
+        "longest_win": int(wins.max()) if len(wins) else 0,
+        "longest_loss": int(losses.max()) if len(losses) else 0,
+        "current": int(run_signs[-1] * lengths[-1]),
+    }
+
+
+def excursions(starts, ends, entry_price, direction, high, low):
+    """Calculates the Maximum Adverse/Favourable Excursion of each trade.
+
+    Trade i is held over candles [starts[i], ends[i]). An end of -1 means the
+    exit time is unknown (EURUSDBot.py journal); the trade is then taken to be
+    held until the next trade's start candle (the bots hold one position at a
+    time), the last one up to the final candle. Trades outside the candles
+    (start < 0 or >= len(high)), with an empty window or no direction get NaN.
+
+    Also returns which trades are closed: their window ends before the last
+    candle, or they started before the first one, so later candles cannot
+    change their values.
+    """
+    n = len(starts)
+    mae = np.full(n, np.nan)
+    mfe = np.full(n, np.nan)
+    closed = starts < 0
+    if n == 0 or len(high) == 0:
+        return mae, mfe, closed
+    order = np.argsort(starts, kind='stable')
+    valid = order[(starts[order] >= 0) & (starts[order] < len(high))]
+    if len(valid) == 0:
+        return mae, mfe, closed
+    idx = starts[valid]
+    next_start = np.concatenate((idx[1:], [len(high)]))
+    # Windows may not run into the next trade, which keeps the bounds ordered for reduceat
+    stop = np.where(ends[valid] < 0, next_start, np.minimum(ends[valid], next_start))
+    bounds = np.empty(2 * len(idx), dtype=np.int64)
+    bounds[0::2], bounds[1::2] = idx, stop
+    # A NaN sentinel keeps a bound equal to len(high) a valid reduceat index
+    highest = np.maximum.reduceat(np.append(high, np.nan), bounds)[0::2]
+    lowest = np.minimum.reduceat(np.append(low, np.nan), bounds)[0::2]
+    # reduceat yields a single element for empty windows, mask those out
+    empty = stop <= idx
+    closed[valid] = stop < len(high)
+    highest[empty] = np.nan
+    lowest[empty] = np.nan
+
+    side = direction[valid]
+    entry = entry_price[valid]
+    long_mfe, long_mae = highest - entry, entry - lowest
+    short_mfe, short_mae = entry - lowest, highest - entry
+    mfe[valid] = np.where(side > 0, long_mfe, np.where(side < 0, short_mfe, np.nan))
+    mae[valid] = np.where(side > 0, long_mae, np.where(side < 0, short_mae, np.nan))
+    return mae, mfe, closed
+
+
+def _downsample(values, max_points=max_curve_points):
+    """Strides a curve down to at most max_points, always keeping the last point."""
+    if len(values) <= max_points:
+        return values
+    idx = np.linspace(0, len(values) - 1, max_points).astype(np.int64)
+    return values[idx]
+
+
+def _to_list(values):
+    """Converts an array to a JSON-safe list (NaN -> None)."""
+    return [None if np.isnan(v) else float(v) for v in np.asarray(values, dtype=np.float64)]
+
+
+def _to_float(value):
+    """Converts a scalar to a JSON-safe float (NaN -> None)."""
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+# --- Analytics Engine ---
+class TradeAnalytics:
+    """Columnar, incrementally refreshed view of the trades journal.
+
+    Works with both journal layouts: profit_loss/units (EURUSDBot.py) and
+    profit/direction (EURUSDBot2.py). Only closed trades (profit set) are
+    analysed, in the order they closed. Metrics are recomputed in vectorized
+    passes only when new trades arrive and are cached in between.
+
+    EURUSDBot.py updates the entry row on exit, so its timestamp is the entry
+    time and the exit time is unknown. EURUSDBot2.py inserts a separate row at
+    exit, whose timestamp is the exit time; the entry time is taken from the
+    latest long/short entry row before it. Exits whose entry row was not seen
+    get no entry time and are left out of the hour/weekday buckets and MAE/MFE.
+    """
+
+    def __init__(self, db_path='trades.db'):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._size = 0
+        self._data = {name: np.empty(initial_capacity, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self._last_id = 0
+        self._open_ids = {}  # id -> entry timestamp of rows still missing their profit (EURUSDBot.py layout)
+        self._last_entry_time = None
+        self._schema = None
+        self._version = 0
+        self._cache = None
+        self._cache_version = -1
+        self._candles = None
+
+    # --- Loading ---
+    def _detect_schema(self, conn):
+        """Maps the journal's columns onto the analytics columns."""
+        names = {row[1] for row in conn.execute("PRAGMA table_info(trades)")}
+        if not names:
+            return None
+        if "profit_loss" in names:
+            # EURUSDBot.py: rows are inserted on entry and updated on exit
+            return {"pnl": "profit_loss", "direction": "units", "updated": True}
+        return {"pnl": "profit", "direction": "direction", "updated": False}
+
+    def _direction(self, values):
+        """Converts the journal's direction column to +1 (long) / -1 (short) / 0."""
+        if self._schema["direction"] == "units":
+            return np.sign(np.asarray(values, dtype=np.float64)).astype(np.int8)
+        values = np.asarray(values, dtype=object)
+        return np.where(values == "long", 1, np.where(values == "short", -1, 0)).astype(np.int8)
+
+    def _append(self, rows):
+        """Appends closed trades to the columnar buffers, growing them as needed."""
+        if not rows:
+            return
+        ids, stamps, entries, pnls, directions, exits = zip(*rows)
+        needed = self._size + len(rows)
+        capacity = len(self._data["id"])
+        if needed > capacity:
+            while capacity < needed:
+                capacity *= 2
+            for name, column in self._data.items():
+                grown = np.empty(capacity, dtype=column.dtype)
+                grown[:self._size] = column[:self._size]
+                self._data[name] = grown
+
+        times = pd.to_datetime(pd.Series(stamps), errors='coerce')
+        exit_times = pd.to_datetime(pd.Series(exits), errors='coerce')
+        batch = {
+            "id": np.asarray(ids, dtype=np.int64),
+            "timestamp": times.to_numpy(dtype="datetime64[ns]"),
+            "exit_time": exit_times.to_numpy(dtype="datetime64[ns]"),
+            "entry_price": np.asarray(entries, dtype=np.float64),
+            "pnl": np.asarray(pnls, dtype=np.float64),
+            "direction": self._direction(directions),
+            # Unknown times go to an extra bucket that the metrics drop
+            "hour": times.dt.hour.fillna(24).to_numpy(dtype=np.int8),
+            "weekday": times.dt.weekday.fillna(7).to_numpy(dtype=np.int8),
+            "mae": np.nan,
+            "mfe": np.nan,
+            "measured": False,
+        }
+        for name, values in batch.items():
+            self._data[name][self._size:needed] = values
+        self._size = needed
+        self._version += 1
+
+    def refresh(self):
+        """Loads trades added or closed since the last refresh. Returns the number of new trades."""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                with self._lock:
+                    if self._schema is None:
+                        self._schema = self._detect_schema(conn)
+                        if self._schema is None:
+                            return 0
+                    pnl, direction = self._schema["pnl"], self._schema["direction"]
+                    columns = f"id, timestamp, entry_price, {pnl}, {direction}"
+
+                    closed = []
+                    open_ids = sorted(self._open_ids)
+                    for i in range(0, len(open_ids), sqlite_chunk_size):
+                        chunk = open_ids[i:i + sqlite_chunk_size]
+                        closed.extend(conn.execute(
+                            f"SELECT {columns} FROM trades WHERE id IN ({','.join('?' * len(chunk))}) "
+                            f"AND {pnl} IS NOT NULL ORDER BY id", chunk).fetchall())
+                    for row in closed:
+                        del self._open_ids[row[0]]
+                    closed = [row + (None,) for row in closed]
+
+                    new_rows = conn.execute(
+                        f"SELECT {columns} FROM trades WHERE id > ? ORDER BY id",
+                        (self._last_id,)).fetchall()
+                    if new_rows:
+                        self._last_id = new_rows[-1][0]
+                    for row in new_rows:
+                        if self._schema["updated"]:
+                            if row[3] is not None:
+                                closed.append(row + (None,))
+                            else:
+                                self._open_ids[row[0]] = row[1]
+                        elif row[3] is None:
+                            if row[4] in ("long", "short"):
+                                self._last_entry_time = row[1]
+                        else:
+                            # Exit row: its timestamp is the exit time, report the trade at its entry time
+                            closed.append((row[0], self._last_entry_time) + row[2:] + (row[1],))
+                            self._last_entry_time = None
+
+                    self._append(closed)
+                    if closed:
+                        self._measure()
+                    return len(closed)
+            finally:
+                conn.close()
+        except Exception as e:
+            logging.error(f"Error refreshing trade analytics: {e}")
+            raise
+
+    def set_candles(self, df):
+        """Merges High/Low candles (DatetimeIndex) into those used for MAE/MFE.
+
+        Feeding the latest candles from the live loop keeps MAE/MFE covering
+        new trades. Trades are measured as their windows close, then candles
+        no longer needed by a pending or open trade are dropped (keeping at
+        most max_candle_history).
+        """
+        candles = df[['High', 'Low']].sort_index()
+        if candles.index.tz is not None:
+            candles = candles.tz_convert(None)  # The journal stores naive UTC timestamps
+        if not len(candles):
+            return
+        with self._lock:
+            if self._candles is not None:
+                # Newer candles replace the overlap, e.g. the still-forming last candle
+                older = self._candles[self._candles.index < candles.index[0]]
+                candles = pd.concat([older, candles])
+            self._candles = candles
+            self._measure()
+            self._trim_candles()
+            self._version += 1
+
+    def _measure(self):
+        """Updates MAE/MFE of the trades whose windows were not closed yet."""
+        if self._candles is None or not len(self._candles) or not self._size:
+            return
+        pending = ~self.column("measured")
+        if not pending.any():
+            return
+        times = self._candles.index.to_numpy(dtype="datetime64[ns]")
+        stamps = self.column("timestamp")
+        starts = np.searchsorted(times, stamps)
+        # Trades entered before the first candle (or at an unknown time) are not covered by the candles
+        starts[(stamps < times[0]) | np.isnat(stamps)] = -1
+        exits = self.column("exit_time")
+        ends = np.where(np.isnat(exits), -1, np.maximum(np.searchsorted(times, exits), starts + 1))
+        mae, mfe, closed = excursions(starts, ends, self.column("entry_price"), self.column("direction"),
+                                      self._candles['High'].to_numpy(dtype=np.float64),
+                                      self._candles['Low'].to_numpy(dtype=np.float64))
+        n = self._size
+        self._data["mae"][:n][pending] = mae[pending]
+        self._data["mfe"][:n][pending] = mfe[pending]
+        self._data["measured"][:n][pending & closed] = True
+
+    def _trim_candles(self):
+        """Drops candles before the earliest trade that may still need them."""
+        needed = [self._candles.index[-1]]
+        pending = ~self.column("measured")
+        stamps = self.column("timestamp")[pending]
+        stamps = stamps[~np.isnat(stamps)]
+        if len(stamps):
+            needed.append(pd.Timestamp(stamps.min()))
+        if self._open_ids:
+            needed.append(pd.Timestamp(min(self._open_ids.values())))
+        if self._last_entry_time is not None:
+            needed.append(pd.Timestamp(self._last_entry_time))
+        keep_from = max(min(needed), self._candles.index[-min(len(self._candles), max_candle_history)])
+        # Keep the candle that contains keep_from
+        first = max(self._candles.index.searchsorted(keep_from, side='right') - 1, 0)
+        self._candles = self._candles.iloc[first:]
+
+    # --- Metrics ---
+    def column(self, name):
+        """Returns a read-only view of a loaded column."""
+        view = self._data[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def _compute(self):
+        """Runs every metric over the loaded columns in vectorized passes."""
+        pnl = self.column("pnl")
+        equity, dd = drawdown(pnl)
+        sharpe = rolling_sharpe(pnl)
+        hourly, hourly_counts = pnl_by_bucket(self.column("hour"), pnl, 24)
+        weekday, weekday_counts = pnl_by_bucket(self.column("weekday"), pnl, 7)
+        hourly, hourly_counts = hourly[:24], hourly_counts[:24]
+        weekday, weekday_counts = weekday[:7], weekday_counts[:7]
+
+        summary = {
+            "trades": int(self._size),
+            "total_pnl": float(equity[-1]) if self._size else 0.0,
+            "win_rate": float((pnl > 0).mean()) if self._size else 0.0,
+            "max_drawdown": float(dd.min()) if self._size else 0.0,
+            "sharpe": _to_float(sharpe[-1]) if len(sharpe) else None,
+            "sharpe_window": sharpe_window,
+            "equity": _to_list(_downsample(equity)),
+            "drawdown": _to_list(_downsample(dd)),
+            "rolling_sharpe": _to_list(_downsample(sharpe)),
+            "pnl_by_hour": _to_list(hourly),
+            "trades_by_hour": hourly_counts.tolist(),
+            "pnl_by_weekday": _to_list(weekday),
+            "trades_by_weekday": weekday_counts.tolist(),
+            "streaks": streaks(pnl),
+            "mae": None,
+            "mfe": None,
+        }
+
+        if self._size and np.isfinite(self.column("mae")).any():
+            summary["mae"] = _to_float(np.nanmean(self.column("mae")))
+            summary["mfe"] = _to_float(np.nanmean(self.column("mfe")))
+        return summary
+
+    def summary(self):
+        """Returns the cached analytics, recomputing them only if trades were added."""
+        try:
+            with self._lock:
+                if self._cache_version != self._version:
+                    self._cache = self._compute()
+                    self._cache_version = self._version
+                return self._cache
+        except Exception as e:
+            logging.error(f"Error computing trade analytics: {e}")
+            raise